@@ -12,6 +12,7 @@ from ct.crypto.asn1 import types
 @types.Universal(6, tag.PRIMITIVE)
 class ObjectIdentifier(types.Simple):
     """Object identifier."""
+    __slots__ = ()
 
     def _name(self, dict_idx):
         try:
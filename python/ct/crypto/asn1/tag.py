@@ -13,6 +13,10 @@ CONSTRUCTED = 0x20
 # Constants for better readability.
 IMPLICIT, EXPLICIT = range(2)
 
+# Tags read from single-byte identifiers, keyed by the identifier octet.
+# Tags are not modified after creation, so each can be shared between reads.
+_single_byte_tags = {}
+
 
 class Tag(object):
     """An ASN.1 tag."""
@@ -58,6 +62,8 @@ class Tag(object):
             tmp.reverse()
             res += tmp
             self.value = ''.join([chr(byte) for byte in res])
+        # Cached so that decoders do not need to call len() on every read.
+        self.value_length = len(self.value)
 
     def __repr__(self):
         return ("%s(%r, %r, %r)" % (self.__class__.__name__, self.number,
@@ -67,7 +73,7 @@ class Tag(object):
         return "[%s %d]" % (self.class_name(), self.number)
 
     def __len__(self):
-        return len(self.value)
+        return self.value_length
 
     def class_name(self):
         if self.tag_class == UNIVERSAL:
@@ -108,6 +114,9 @@ class Tag(object):
 
         if not buf:
             raise error.ASN1TagError("Ran out of bytes while decoding")
+        tag = _single_byte_tags.get(buf[0])
+        if tag is not None:
+            return tag, buf[1:]
         tag_bytes = 0
         id_byte = ord(buf[tag_bytes])
         tag_class = id_byte & cls._CLASS_MASK
@@ -131,4 +140,6 @@ class Tag(object):
                 raise error.ASN1TagError("Base 128 integer too large")
             tag_bytes -= 1
         tag = cls(number, tag_class, encoding)
+        if not tag_bytes:
+            _single_byte_tags[buf[0]] = tag
         return tag, buf[tag_bytes + 1:]
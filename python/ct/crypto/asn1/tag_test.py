@@ -47,6 +47,9 @@ class TagTest(unittest.TestCase):
             self.assertEqual((t, ""), tag.Tag.read(enc))
             self.assertEqual((t, "rest"), tag.Tag.read(enc + "rest"))
 
+            # Reading again gives the same result.
+            self.assertEqual((t, ""), tag.Tag.read(enc))
+
         for i in range(len(valid_tags)):
             for j in range(i+1, len(valid_tags)):
                 self.assertNotEqual(tag.Tag(*valid_tags[i][0]),
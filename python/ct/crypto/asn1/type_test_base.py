@@ -80,6 +80,16 @@ class TypeTestBase(unittest.TestCase):
             self.assertEqual(enc, o1.encode().encode("hex"))
             self.assertEqual(enc, o2.encode().encode("hex"))
 
+    def test_decode_from_bytearray(self):
+        encodings = ([(enc, True) for _, enc in self.encode_test_vectors] +
+                     [(enc, False) for _, enc in self.bad_strict_encodings])
+        for enc, strict in encodings:
+            buf = bytearray(enc.decode("hex"))
+            o = self.asn1_type.decode(buf, strict=strict)
+            # The decoded object must not depend on the caller's buffer.
+            buf[:] = "\x00" * (len(buf) + 1)
+            self.assertEqual(enc, o.encode().encode("hex"))
+
     def test_decode_fails(self):
         for bad_enc in self.bad_encodings:
             self.assertRaises(error.ASN1Error, self.asn1_type.decode,
@@ -18,9 +18,11 @@ and should be checked at application level, where necessary.
 """
 
 import abc
+import binascii
 import collections
 import functools
 import re
+import struct
 
 from ct.crypto import error
 from ct.crypto.asn1 import print_util
@@ -31,6 +33,41 @@ _ZERO = "\x00"
 _MINUS_ONE = "\xff"
 _EOC = "\x00\x00"
 
+# Indexing a string, buffer or memoryview yields a one-character string on
+# Python 2 but an integer on Python 3. Decide once which it is and map single
+# bytes to their values with a table lookup instead of calling ord() per byte.
+_is_bytes = bytes is not str
+if _is_bytes:
+    _BYTE_VALUE = tuple(range(256))
+else:
+    _BYTE_VALUE = dict((chr(i), i) for i in range(256))
+
+
+def _to_string(buf):
+    """Copy a memoryview into a string. Other buffers are returned as is."""
+    if type(buf) is memoryview:
+        return buf.tobytes()
+    return buf
+
+
+# Bignum (de)serialization. Python 2 has no int.to_bytes/int.from_bytes, so
+# we go through the C-level hex conversions instead of looping over bytes.
+# Integers that fit in 64 bits are handled with struct instead, which is
+# cheaper for the small values that dominate certificates.
+def _int_to_bytes(value, length):
+    """Big-endian encoding of a non-negative integer in |length| bytes."""
+    return binascii.unhexlify("%0*x" % (2 * length, value))
+
+
+def _int_from_bytes(buf):
+    """Big-endian decoding of a non-negative integer."""
+    return int(binascii.hexlify(buf), 16)
+
+
+_MIN_INT64 = -0x8000000000000000
+_MAX_INT64 = 0x7fffffffffffffff
+_MAX_UINT64 = 0xffffffffffffffff
+
 
 def encode_int(value, signed=True):
     """Encode an integer.
@@ -49,29 +86,33 @@ def encode_int(value, signed=True):
     if not signed and value < 0:
         raise ValueError("Unsigned integer cannot be negative")
 
-    if not value:
-        return _ZERO
-    if value == -1:
-        return _MINUS_ONE
-
-    int_bytes = bytearray()
-
-    while value != 0 and value != -1:
-        int_bytes.append(value & 0xff)
-        value >>= 8
-
-    if signed:
-        # In two's complement form, negative values have the most significant
-        # bit set, thus we:
-        if value == -1 and int_bytes[-1] <= 127:
-            # Add a "-1"-byte for indicating a negative value.
-            int_bytes.append(0xff)
-        elif value == 0 and int_bytes[-1] > 127:
-            # Add a "0"-byte for indicating a positive value.
-            int_bytes.append(0)
-
-    int_bytes.reverse()
-    return str(int_bytes)
+    if not signed:
+        if value <= 0xff:
+            return chr(value)
+        if value <= _MAX_UINT64:
+            return struct.pack(">Q", value).lstrip(_ZERO)
+        return _int_to_bytes(value, (value.bit_length() + 7) // 8)
+
+    if -0x80 <= value <= 0x7f:
+        return chr(value & 0xff)
+    # In two's complement form, the most significant bit indicates the sign,
+    # so after stripping redundant sign bytes we may need to put one back.
+    if _MIN_INT64 <= value <= _MAX_INT64:
+        if value > 0:
+            encoded = struct.pack(">q", value).lstrip(_ZERO)
+            if encoded[0] > "\x7f":
+                return _ZERO + encoded
+            return encoded
+        encoded = struct.pack(">q", value).lstrip(_MINUS_ONE)
+        if encoded[0] < "\x80":
+            return _MINUS_ONE + encoded
+        return encoded
+
+    if value > 0:
+        length = value.bit_length() // 8 + 1
+        return _int_to_bytes(value, length)
+    length = (~value).bit_length() // 8 + 1
+    return _int_to_bytes(value + (1 << (8 * length)), length)
 
 
 def decode_int(buf, signed=True, strict=True):
@@ -88,30 +129,53 @@ def decode_int(buf, signed=True, strict=True):
     Returns:
         an integer.
     """
-    if not buf:
+    length = len(buf)
+    if length == 1:
+        # Fast path for the most common case (versions, small enumerations).
+        value = _BYTE_VALUE[buf[0]]
+        if signed and value > 127:
+            return value - 256
+        return value
+    if not length:
         raise error.ASN1Error("Invalid integer encoding: empty value")
 
-    leading = ord(buf[0])
-    int_bytes = bytearray(buf[1:])
-
-    if int_bytes:
-      if strict and leading == 0 and int_bytes[0] < 128:
-        # 0x00 0x42 == 0x42
-        raise error.ASN1Error("Extra leading 0-bytes in integer "
-                              "encoding")
-      elif strict and signed and leading == 0xff and int_bytes[0] >= 128:
-        # 0xff 0x82 == 0x82
-        raise error.ASN1Error("Extra leading 0xff-bytes in negative "
-                              "integer encoding")
-
+    leading = _BYTE_VALUE[buf[0]]
+    if strict:
+        if leading == 0 and _BYTE_VALUE[buf[1]] < 128:
+            # 0x00 0x42 == 0x42
+            raise error.ASN1Error("Extra leading 0-bytes in integer "
+                                  "encoding")
+        elif signed and leading == 0xff and _BYTE_VALUE[buf[1]] >= 128:
+            # 0xff 0x82 == 0x82
+            raise error.ASN1Error("Extra leading 0xff-bytes in negative "
+                                  "integer encoding")
+
+    # Decode as unsigned, then apply the sign. The cheapest conversion depends
+    # on the length: plain arithmetic for up to three bytes, a single struct
+    # call on the zero-padded value up to 64 bits, and hex conversion for
+    # bignums.
+    if length == 2:
+        value = (leading << 8) | _BYTE_VALUE[buf[1]]
+    elif length == 3:
+        value = ((leading << 16) | (_BYTE_VALUE[buf[1]] << 8) |
+                 _BYTE_VALUE[buf[2]])
+    elif length <= 8:
+        if type(buf) is not str:
+            buf = bytes(bytearray(buf))
+        if signed and length == 8:
+            # Unpack as signed, so that negative values stay ints.
+            return struct.unpack(">q", buf)[0]
+        value = struct.unpack(">Q", _ZERO * (8 - length) + buf)[0]
+    else:
+        value = _int_from_bytes(buf)
+        if signed and leading > 127:
+            # Non-strict encodings may pad small values; int() turns the
+            # result back into an int where it fits.
+            return int(value - (1 << (8 * length)))
+        return value
     if signed and leading > 127:
-            leading -= 256
-
-    for b in int_bytes:
-        leading <<= 8
-        leading += b
-
-    return leading
+        value -= 1 << (8 * length)
+    return value
 
 
 # Lengths between 0 and 127 are encoded as a single byte.
@@ -134,6 +198,15 @@ def encode_length(length):
     """
     if length <= 127:
         return chr(length)
+    # Fast paths for the lengths that occur in practice.
+    if length <= 0xff:
+        return "\x81" + chr(length)
+    if length <= 0xffff:
+        return "\x82" + struct.pack(">H", length)
+    if length <= 0xffffff:
+        return "\x83" + struct.pack(">I", length)[1:]
+    if length <= 0xffffffff:
+        return "\x84" + struct.pack(">I", length)
     encoded_length = encode_int(length, signed=False)
     return chr(_MULTIBYTE_LENGTH | len(encoded_length)) + encoded_length
 
@@ -153,22 +226,46 @@ def read_length(buf, strict=True):
         the length of an ASN.1 object, and the remaining bytes. For indefinite
         length, returns (-1, rest).
     """
-    if not buf:
+    length, offset = _read_length_at(buf, 0, strict=strict)
+    return length, buf[offset:]
+
+
+def _read_length_at(buf, offset, strict=True):
+    """Read an ASN.1 object length at the given offset of the buffer.
+
+    Like read_length() but returns the offset of the first byte following the
+    length instead of slicing the buffer.
+
+    Returns:
+        a (length, offset) tuple. For indefinite length, returns (-1, offset).
+    """
+    if len(buf) <= offset:
         raise error.ASN1Error("Invalid length encoding: empty value")
-    length, rest = ord(buf[0]), buf[1:]
+    length = _BYTE_VALUE[buf[offset]]
+    offset += 1
     if length <= 127:
-        return length, rest
+        return length, offset
     # 0x80 == ASN.1 indefinite length
     if length == 128:
         if strict:
             raise error.ASN1Error("Indefinite length encoding")
-        return -1, rest
+        return -1, offset
 
     length &= _MULTIBYTE_LENGTH_MASK
-    if len(rest) < length:
+    end = offset + length
+    if len(buf) < end:
         raise error.ASN1Error("Invalid length encoding")
+    # Fast paths for 1- and 2-byte lengths, which cover nearly all objects.
+    if length == 1:
+        return _BYTE_VALUE[buf[offset]], end
+    if length == 2:
+        length = struct.unpack_from(">H", buf, offset)[0]
+        if length < 128:
+            raise error.ASN1Error("Extra leading 0-bytes in integer "
+                                  "encoding")
+        return length, end
     # strict=True: let's hope that at least ASN.1 lengths are properly encoded.
-    return (decode_int(rest[:length], signed=False, strict=True), rest[length:])
+    return decode_int(buf[offset:end], signed=False, strict=True), end
 
 
 class Universal(object):
@@ -257,9 +354,8 @@ class Explicit(object):
         Returns:
             the class with a modified 'tags' attribute.
         """
-        tags = list(cls.tags)
-        tags.append(self._tag)
-        cls.tags = tuple(tags)
+        # tuple() returns tuples as is, so this only copies other iterables.
+        cls.tags = tuple(cls.tags) + (self._tag,)
         return cls
 
 
@@ -313,21 +409,25 @@ class Implicit(object):
         """
         if not cls.tags:
             raise TypeError("Cannot implicitly tag an untagged type")
-        tags = list(cls.tags)
         # Only simple types and simple types derived via implicit tagging have a
         # primitive encoding, so the last tag determines the encoding type.
-        tags[-1] = (tag.Tag(self._number, self._tag_class,
-                            cls.tags[-1].encoding))
-        cls.tags = tuple(tags)
+        cls.tags = tuple(cls.tags[:-1]) + (
+            tag.Tag(self._number, self._tag_class, cls.tags[-1].encoding),)
         return cls
 
 
 class Abstract(object):
     """Abstract base class."""
+    __slots__ = ("_value", "_serialized_value", "_cached_encoding")
     __metaclass__ = abc.ABCMeta
 
     tags = ()
 
+    # Decoding passes memoryview slices of the original buffer down the
+    # recursion so that nested values can be read without copying. Types that
+    # decode their contents from a string get a copy of their own bytes only.
+    _decode_from_string = True
+
     @classmethod
     def explicit(cls, number, tag_class=tag.CONTEXT_SPECIFIC):
         """Dynamically create a new tagged type.
@@ -345,7 +445,7 @@ class Abstract(object):
         # return the _same_ type when called more than once with the same
         # arguments.
         mcs = cls.__metaclass__
-        return_class = mcs(name, (cls,), {})
+        return_class = mcs(name, (cls,), {"__slots__": ()})
         return Explicit(number, tag_class)(return_class)
 
     @classmethod
@@ -361,7 +461,7 @@ class Abstract(object):
         """
         name = "%s.implicit(%d, %d)" % (cls.__name__, number, tag_class)
         mcs = cls.__metaclass__
-        return_class = mcs(name, (cls,), {})
+        return_class = mcs(name, (cls,), {"__slots__": ()})
         return Implicit(number, tag_class)(return_class)
 
     def __init__(self, value=None, serialized_value=None, strict=True):
@@ -379,12 +479,32 @@ class Abstract(object):
             TypeError: invalid initializer.
         """
         if serialized_value is not None:
+            if (self._decode_from_string and
+                type(serialized_value) is memoryview):
+                serialized_value = serialized_value.tobytes()
             self._value = self._decode_value(serialized_value, strict=strict)
         elif value is not None:
             self._value = self._convert_value(value)
         else:
             raise TypeError("Cannot initialize from None")
         self._serialized_value = serialized_value
+        self._cached_encoding = None
+
+    def __getstate__(self):
+        # Objects with __slots__ must provide their own state for pickle and
+        # copy. Decoded objects may also hold memoryview slices of the input,
+        # which can be neither pickled nor copied, so save those as strings.
+        state = dict(getattr(self, "__dict__", ()))
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get("__slots__", ()):
+                if hasattr(self, name):
+                    state[name] = getattr(self, name)
+        state["_serialized_value"] = _to_string(self._serialized_value)
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.iteritems():
+            setattr(self, name, value)
 
     @classmethod
     def _convert_value(cls, value):
@@ -452,28 +572,97 @@ class Abstract(object):
         Returns:
             a string representing the encoded object.
         """
+        # The complete encoding of an unmodified object never changes, so we
+        # can reuse it once computed. Checking for modifications walks the
+        # whole subtree of a constructed object, so only do it when there is
+        # an encoding to reuse.
+        #
+        # We can only use the cached value if the object has never been
+        # modified after birth. Since mutable objects cannot track when their
+        # recursive subcomponents are modified, the modified flag, once set,
+        # can never be unset.
+        cache = True
+        if self._cached_encoding is not None:
+            if not self.modified():
+                return self._cached_encoding
+            self._cached_encoding = None
+            cache = False
+
         # If we have a read-only object that we created from a serialized value
-        # and never modified since, use the original cached value.
+        # and never modified since, use the original serialized value.
         #
         # This ensures that objects decoded in non-strict mode will retain their
         # original encoding.
         #
         # BUG: we do not cache tag and length encoding, so reencoding is broken
         # for objects that use indefinite length encoding.
-        if self._serialized_value and not self.modified():
-            encoded_value = self._serialized_value
-        else:
-            # We can only use the cached value if the object has never been
-            # modified after birth. Since mutable objects cannot track when
-            # their recursive subcomponents are modified, the modified flag,
-            # once set, can never be unset.
+        serialized_value = self._serialized_value
+        if serialized_value is not None:
+            # The complete encoding replaces the serialized value, so that we
+            # only keep one copy of the bytes.
             self._serialized_value = None
+            if serialized_value and cache and not self.modified():
+                encoded_value = _to_string(serialized_value)
+            else:
+                cache = False
+                encoded_value = self._encode_value()
+        else:
             encoded_value = self._encode_value()
-        for t in self.tags:
-            encoded_length = encode_length(len(encoded_value))
-            encoded_value = t.value + encoded_length + encoded_value
+        tags = self.tags
+        if len(tags) == 1:
+            # Fast path for the common case of a single tag.
+            encoded_value = "".join((tags[0].value,
+                                     encode_length(len(encoded_value)),
+                                     encoded_value))
+        else:
+            # Collect the tag and length headers from the inside out and join
+            # everything once, instead of copying the value for each tag.
+            pieces = []
+            length = len(encoded_value)
+            for t in tags:
+                encoded_length = encode_length(length)
+                pieces.append(encoded_length)
+                pieces.append(t.value)
+                length += len(encoded_length) + t.value_length
+            pieces.reverse()
+            pieces.append(encoded_value)
+            encoded_value = "".join(pieces)
+        if cache:
+            # An object built from a value may already have been modified; if
+            # so, the next call finds out and drops the cached encoding.
+            self._cached_encoding = encoded_value
         return encoded_value
 
+    @classmethod
+    def _read_tag_and_length(cls, buf, offset, t, strict=True):
+        """Match a tag and read the length that follows it.
+
+        Args:
+            buf: a string or string buffer.
+            offset: the offset of the tag in the buffer.
+            t: the expected tag.
+            strict: if False, accept indefinite length for constructed tags.
+
+        Raises:
+            ASN1TagError: the tag does not match.
+            ASN1Error: invalid length encoding.
+
+        Returns:
+            a (length, offset) tuple consisting of the decoded length (-1 for
+            indefinite length) and the offset of the value.
+        """
+        tag_end = offset + t.value_length
+        if buf[offset:tag_end] != t.value:
+            raise error.ASN1TagError(
+                "Invalid tag: expected %s, got %s while decoding %s" %
+                (t, _to_string(buf[offset:tag_end]), cls.__name__))
+        # Logging statements are really expensive in the recursion even
+        # if debug-level logging itself is disabled.
+        # logging.debug("%s: read tag %s", cls.__name__, t)
+        # Only permit indefinite length for constructed types.
+        return _read_length_at(buf, tag_end, strict=(
+            strict or t.encoding != tag.CONSTRUCTED))
+
     @classmethod
     def read(cls, buf, strict=True):
         """Read from a string or buffer.
@@ -486,7 +675,12 @@ class Abstract(object):
             a tuple consisting of an instance of the class and the remaining
             bytes.
         """
-        if cls.tags:
+        tags = cls.tags
+        if len(tags) == 1:
+            value, end = cls._read_at(buf, 0, strict=strict)
+            return value, buf[end:]
+
+        if tags:
             # Each indefinite length must be closed with the EOC (\x00\x00)
             # octet.
             # If we have multiple tags (i.e., explicit tagging is used) and the
@@ -494,35 +688,30 @@ class Abstract(object):
             # to the end (while a regular tag adds nothing). Therefore, we first
             # read all tags, then the value, and finally strip the EOC octets of
             # the explicit tags.
+            # We track the read position as an offset and only slice the buffer
+            # once all tags have been read.
             indefinite = 0
-            for t in reversed(cls.tags):
-                if buf[:len(t)] != t.value:
-                    raise error.ASN1TagError(
-                        "Invalid tag: expected %s, got %s while decoding %s" %
-                        (t, buf[:len(t.value)], cls.__name__))
-                # Logging statements are really expensive in the recursion even
-                # if debug-level logging itself is disabled.
-                # logging.debug("%s: read tag %s", cls.__name__, t)
-                buf = buf[len(t):]
-                # Only permit indefinite length for constructed types.
-                decoded_length, buf = read_length(buf, strict=(
-                    strict or t.encoding != tag.CONSTRUCTED))
+            offset = 0
+            for t in reversed(tags):
+                decoded_length, offset = cls._read_tag_and_length(
+                    buf, offset, t, strict=strict)
                 if decoded_length == -1:
                     indefinite += 1
                 # logging.debug("%s: read length %d", cls.__name__,
                 #               decoded_length)
-                elif len(buf) < decoded_length:
+                elif len(buf) - offset < decoded_length:
                     raise error.ASN1Error("Invalid length encoding in %s: "
                                           "read length %d, remaining bytes %d" %
                                           (cls.__name__, decoded_length,
-                                           len(buf)))
+                                           len(buf) - offset))
 
             # The last tag had definite length.
             if decoded_length != -1:
-                value, rest = (cls(serialized_value=buf[:decoded_length],
-                                   strict=strict), buf[decoded_length:])
+                end = offset + decoded_length
+                value, rest = (cls(serialized_value=buf[offset:end],
+                                   strict=strict), buf[end:])
             else:
-                decoded, rest = cls._read_indefinite_value(buf)
+                decoded, rest = cls._read_indefinite_value(buf[offset:])
                 value = cls(value=decoded)
                 # _read_indefinite_value will strip the inner EOC.
                 indefinite -= 1
@@ -540,10 +729,51 @@ class Abstract(object):
         # logging.debug("Remaining bytes: %d", len(rest))
         return value, rest
 
+    @classmethod
+    def _read_at(cls, buf, offset, strict=True):
+        """Read from the given offset of a string or buffer.
+
+        Like read() but returns the offset of the first byte following the
+        object instead of slicing the buffer.
+
+        Args:
+            buf: a string or string buffer.
+            offset: the offset of the object in the buffer.
+            strict: if False, tolerate some non-fatal decoding errors.
+
+        Returns:
+            a tuple consisting of an instance of the class and the offset of
+            the remaining bytes.
+        """
+        tags = cls.tags
+        if len(tags) != 1:
+            # Explicitly tagged, or untagged CHOICE and ANY.
+            value, rest = cls.read(buf[offset:], strict=strict)
+            return value, len(buf) - len(rest)
+
+        # Fast path for the common case of a single tag: there are no
+        # outer explicit tags and thus no outer EOC octets to strip.
+        decoded_length, offset = cls._read_tag_and_length(
+            buf, offset, tags[0], strict=strict)
+        if decoded_length == -1:
+            decoded, rest = cls._read_indefinite_value(buf[offset:])
+            return cls(value=decoded), len(buf) - len(rest)
+        end = offset + decoded_length
+        if len(buf) < end:
+            raise error.ASN1Error("Invalid length encoding in %s: "
+                                  "read length %d, remaining bytes %d" %
+                                  (cls.__name__, decoded_length,
+                                   len(buf) - offset))
+        return cls(serialized_value=buf[offset:end], strict=strict), end
+
     @classmethod
     def decode(cls, buf, strict=True):
         """Decode from a string or buffer.
 
+        Decoded objects may keep references to parts of a string input, and
+        with them the whole string. Other buffers are copied first, so that
+        decoded objects never depend on memory that the caller may change.
+
         Args:
             buf: a string or string buffer.
             strict: if False, tolerate some non-fatal decoding errors.
@@ -551,7 +781,10 @@ class Abstract(object):
         Returns:
             an instance of the class.
         """
-        value, rest = cls.read(buf, strict=strict)
+        view = memoryview(buf)
+        if not isinstance(buf, bytes):
+            view = memoryview(view.tobytes())
+        value, rest = cls.read(view, strict=strict)
         if rest:
             raise error.ASN1Error("Invalid encoding: leftover bytes when "
                                   "decoding %s" % cls.__name__)
@@ -561,9 +794,19 @@ class Abstract(object):
     # Note this means objects with equal values do not necessarily have
     # equal encodings.
     def __eq__(self, other):
+        if self is other:
+            return True
+        # Objects of the same type can compare their internal values directly,
+        # without building a copy through the value property.
+        if type(other) is type(self):
+            return self._value == other._value
         return self.value == other
 
     def __ne__(self, other):
+        if self is other:
+            return False
+        if type(other) is type(self):
+            return self._value != other._value
         return self.value != other
 
     @abc.abstractmethod
@@ -603,6 +846,7 @@ class Abstract(object):
 @functools.total_ordering
 class Simple(Abstract):
     """Base class for Boolean, Integer, and string types."""
+    __slots__ = ()
     # Pretty-printed character length.
     # OctetString and BitString use this to nicely format hex bytes.
     char_wrap = 1
@@ -687,6 +931,7 @@ class Simple(Abstract):
 @Universal(1, tag.PRIMITIVE)
 class Boolean(Simple):
     """Boolean."""
+    __slots__ = ()
     _TRUE = "\xff"
     _FALSE = "\x00"
 
@@ -695,6 +940,8 @@ class Boolean(Simple):
 
     @classmethod
     def _convert_value(cls, value):
+        if type(value) is bool:
+            return value
         return bool(value)
 
     @classmethod
@@ -702,17 +949,19 @@ class Boolean(Simple):
         if len(buf) != 1:
             raise error.ASN1Error("Invalid encoding")
 
+        # The value is a single byte, so compare the whole buffer.
+        if buf == cls._FALSE:
+            return False
         # Continuing here breaks re-encoding.
-        if strict and buf[0] != cls._TRUE and buf[0] != cls._FALSE:
-                raise error.ASN1Error("BER encoding of Boolean value: %s" %
-                                      buf[0])
-        value = False if buf[0] == cls._FALSE else True
-        return value
+        if strict and buf != cls._TRUE:
+            raise error.ASN1Error("BER encoding of Boolean value: %s" % buf)
+        return True
 
 
 @Universal(2, tag.PRIMITIVE)
 class Integer(Simple):
     """Integer."""
+    __slots__ = ()
 
     def _encode_value(self):
         return encode_int(self._value)
@@ -728,6 +977,7 @@ class Integer(Simple):
 @Universal(5, tag.PRIMITIVE)
 class Null(Simple):
     """Null."""
+    __slots__ = ()
 
     def _encode_value(self):
         return ""
@@ -740,15 +990,24 @@ class Null(Simple):
     def _decode_value(cls, buf, strict=True):
         return None
 
+# Decoded strings up to this length are interned.
+_SMALL_STR_INTERN_LIMIT = 32
+
+
 class ASN1String(Simple):
     """Base class for string types."""
+    __slots__ = ()
 
     def _encode_value(self):
         return self._value
 
     @classmethod
     def _convert_value(cls, value):
-        if isinstance(value, str) or isinstance(value, buffer):
+        # Check for the common case of a plain string first: an exact type
+        # check is cheaper than walking the isinstance() chain.
+        if type(value) is str:
+            pass
+        elif isinstance(value, (str, buffer)):
             value = str(value)
         elif isinstance(value, ASN1String):
             value = value.value
@@ -774,6 +1033,10 @@ class ASN1String(Simple):
     def _decode_value(cls, buf, strict=True):
         if strict:
             cls._check_for_illegal_characters(buf)
+        # Short strings such as country codes and organization names repeat
+        # across certificates, so share a single copy of each.
+        if len(buf) <= _SMALL_STR_INTERN_LIMIT and type(buf) is str:
+            return intern(buf)
         return buf
 
 
@@ -782,6 +1045,7 @@ class ASN1String(Simple):
 @Universal(19, tag.PRIMITIVE)
 class PrintableString(ASN1String):
     """PrintableString."""
+    __slots__ = ()
     NOT_ACCEPTABLE = re.compile("[^a-zA-Z0-9 '()+,\-./:=?]")
     @classmethod
     def _check_for_illegal_characters(cls, buf):
@@ -795,12 +1059,13 @@ class PrintableString(ASN1String):
 @Universal(20, tag.PRIMITIVE)
 class TeletexString(ASN1String):
     """TeletexString (aka T61String)."""
-    pass
+    __slots__ = ()
 
 
 @Universal(22, tag.PRIMITIVE)
 class IA5String(ASN1String):
     """IA5String."""
+    __slots__ = ()
     @classmethod
     def _check_for_illegal_characters(self, buf):
         for index, character in enumerate(buf):
@@ -812,6 +1077,7 @@ class IA5String(ASN1String):
 @Universal(26, tag.PRIMITIVE)
 class VisibleString(ASN1String):
     """VisibleString (aka ISO646String)."""
+    __slots__ = ()
     @classmethod
     def _check_for_illegal_characters(self, buf):
         for index, character in enumerate(buf):
@@ -823,56 +1089,102 @@ class VisibleString(ASN1String):
 @Universal(30, tag.PRIMITIVE)
 class BMPString(ASN1String):
     """BMPString."""
-    pass
+    __slots__ = ()
 
 
 @Universal(12, tag.PRIMITIVE)
 class UTF8String(ASN1String):
     """UTF8String."""
-    pass
+    __slots__ = ()
 
 
 @Universal(28, tag.PRIMITIVE)
 class UniversalString(ASN1String):
     """UniversalString."""
-    pass
+    __slots__ = ()
 
 
 @Universal(4, tag.PRIMITIVE)
 class OctetString(ASN1String):
     """Octet string."""
+    __slots__ = ()
     char_wrap = 3
 
     def __str__(self):
         return print_util.bytes_to_hex(self._value)
 
+    @classmethod
+    def _decode_value(cls, buf, strict=True):
+        # Octet strings are mostly unique binary data (key identifiers,
+        # hashes), so they are not interned.
+        if strict:
+            cls._check_for_illegal_characters(buf)
+        return buf
+
+
+# Lookup table for expanding short byte strings into bit strings.
+_BYTE_TO_BITS = [format(i, "08b") for i in range(256)]
+# Longer values are converted as one big integer, which runs in C: a single
+# int(x, 2) or bin() call replaces a lookup per byte.
+_TABLE_MAX_BITSTRING_BYTES = 16
+
+
+def _bits_to_bytes(bits):
+    """Pack a string of '0's and '1's into bytes, padding with 0-bits."""
+    if not bits:
+        return ""
+    pad = (8 - len(bits) % 8) % 8
+    return _int_to_bytes(int(bits, 2) << pad, (len(bits) + pad) // 8)
+
+
+def _bytes_to_bits(raw):
+    """Expand bytes into a string of '0's and '1's."""
+    if len(raw) <= _TABLE_MAX_BITSTRING_BYTES:
+        return "".join([_BYTE_TO_BITS[b] for b in bytearray(raw)])
+    # bin() drops leading zeros, so pad back to the full width.
+    return bin(_int_from_bytes(raw))[2:].zfill(8 * len(raw))
+
 
 @Universal(3, tag.PRIMITIVE)
 class BitString(Simple):
     """Bit string."""
+    __slots__ = ()
     char_wrap = 3
 
+    # Internally, the bits are stored packed as a (bytes, bit_length) tuple,
+    # where the bytes are padded with 0-bits. The public value is the string
+    # of '0's and '1's.
+    @property
+    def value(self):
+        """The value of a BitString is a string of '0's and '1's."""
+        raw, bit_length = self._value
+        return _bytes_to_bits(raw)[:bit_length]
+
     def __str__(self):
-        return print_util.bits_to_hex(self._value)
+        return print_util.bits_to_hex(self.value)
+
+    # Avoid unpacking the bits just to test for emptiness. __hash__ still goes
+    # through the value, as it must agree with the hash of an equal string.
+    def __bool__(self):
+        return self._value[1] != 0
+
+    def __nonzero__(self):
+        return self._value[1] != 0
 
     def _encode_value(self):
-        pad = (8 - len(self._value) % 8) % 8
-        padded_bits = self._value + pad*"0"
-        ret = bytearray([pad])
-        for i in range(0, len(padded_bits), 8):
-            ret.append(int(padded_bits[i:i+8], 2))
-        return str(ret)
+        raw, bit_length = self._value
+        return chr((8 - bit_length % 8) % 8) + raw
 
     def _convert_value(self, value):
         """The value of a BitString is a string of '0's and '1's."""
         if isinstance(value, BitString):
-            return value.value
+            return value._value
         elif isinstance(value, str):
             # Must be a string of '0's and '1's.
             if not all(c == "0" or c == "1" for c in value):
                 raise ValueError("Cannot initialize a BitString from %s:"
                                  "string must consist of 0s and 1s" % value)
-            return value
+            return _bits_to_bytes(value), len(value)
         else:
             raise TypeError("Cannot initialize a BitString from %s"
                             % type(value))
@@ -882,20 +1194,19 @@ class BitString(Simple):
         if not buf:
             raise error.ASN1Error("Invalid encoding: empty %s value" %
                                   cls.__name__)
-        int_bytes = bytearray(buf)
-        pad = int_bytes[0]
+        pad = ord(buf[0])
         if pad > 7:
             raise error.ASN1Error("Invalid padding %d in %s" %
                                   (pad, cls.__name__))
-        ret = "".join(format(b, "08b") for b in int_bytes[1:])
         if pad:
-            if not ret or any([c == "1" for c in ret[-1*pad:]]):
+            # The padding bits must all be 0.
+            if len(buf) == 1 or ord(buf[-1]) & ((1 << pad) - 1):
                 raise error.ASN1Error("Invalid padding")
-            ret = ret[:-1*pad]
-        return ret
+        return buf[1:], 8 * (len(buf) - 1) - pad
 
 class NamedBitList(BitString):
     """A bit string with named bits."""
+    __slots__ = ()
     # To use the NamedBitList ASN.1 construct, set named_bit_list
     # to a tuple of NamedValue instances, where the name of each NamedValue
     # corresponds to the identifier and the value to the number of the
@@ -931,7 +1242,9 @@ class NamedBitList(BitString):
         # Application designers should therefore ensure that different semantics
         # are not associated with such values which differ only in the number of
         # trailing 0 bits.
-        return len(self._value) > number and self._value[number] == "1"
+        raw, bit_length = self._value
+        return (number < bit_length and
+                bool(ord(raw[number // 8]) & (0x80 >> (number % 8))))
 
     def bits_set(self):
         """List the named_bit_list elements whose bit is set."""
@@ -948,6 +1261,7 @@ class Any(ASN1String):
     The value of an Any is an undecoded raw string. In addition, Any can hold
     the decoded value of the object.
     """
+    __slots__ = ("_decoded_value",)
     char_wrap = 3
 
     def __init__(self, value=None, serialized_value=None, strict=True):
@@ -1058,8 +1372,11 @@ class Any(ASN1String):
 
 class Constructed(Abstract):
     """Constructed types."""
+    __slots__ = ("_modified",)
     print_labels = True
     print_delimiter = "\n"
+    # Components are read directly from the view of the serialized value.
+    _decode_from_string = False
 
     def __init__(self, value=None, serialized_value=None, strict=True):
         """Initialize from a value or serialized buffer.
@@ -1176,11 +1493,17 @@ class MetaChoice(abc.ABCMeta):
                                     "specification")
                 tag_map[spec.tags[-1]] = key
             dic["tag_map"] = tag_map
+            # Choices have few components, so the decoder scans this table
+            # of (encoded outer tag, key, spec) entries rather than hashing
+            # Tag objects into tag_map.
+            dic["_tag_table"] = tuple((spec.tags[-1].value, key, spec)
+                                      for key, spec in components.iteritems())
         return super(MetaChoice, mcs).__new__(mcs, name, bases, dic)
 
 
 class Choice(Constructed, collections.MutableMapping):
     """Choice."""
+    __slots__ = ()
     __metaclass__ = MetaChoice
 
     # There is only ever one component anyway.
@@ -1209,6 +1532,7 @@ class Choice(Constructed, collections.MutableMapping):
                 serialized_value, readahead_tag, readahead_value,
                 strict=strict)
             self._serialized_value = serialized_value
+            self._cached_encoding = None
             self._modified = False
         else:
             super(Choice, self).__init__(value=value,
@@ -1312,22 +1636,23 @@ class Choice(Constructed, collections.MutableMapping):
     def _decode_readahead_value(cls, buf, readahead_tag, readahead_value,
                                 strict=True):
         """Decode using additional information about the outermost tag."""
-        try:
-            key = cls.tag_map[readahead_tag]
-        except KeyError:
+        tag_value = readahead_tag.value
+        for component_tag_value, key, spec in cls._tag_table:
+            if component_tag_value == tag_value:
+                break
+        else:
             raise error.ASN1TagError("Tag %s is not a valid tag for a "
                                      "component of %s" %
                                      (readahead_tag, cls.__name__))
 
-        if len(cls.components[key].tags) == 1:
+        if len(spec.tags) == 1:
             # Shortcut: we already know the tag and length, so directly get
             # the value.
-            value = cls.components[key](serialized_value=readahead_value,
-                                        strict=strict)
+            value = spec(serialized_value=readahead_value, strict=strict)
         else:
             # Component has multiple tags but the readahead only read the
             # outermost tag, so read everything again.
-            value, rest = cls.components[key].read(buf, strict=strict)
+            value, rest = spec.read(buf, strict=strict)
             if rest:
                 raise error.ASN1Error("Invalid encoding: leftover bytes when "
                                       "decoding %s" % cls.__name__)
@@ -1352,6 +1677,7 @@ class Choice(Constructed, collections.MutableMapping):
 
 class Repeated(Constructed, collections.MutableSequence):
     """Base class for SetOf and SequenceOf."""
+    __slots__ = ()
 
     def __getitem__(self, index):
         return self._value[index]
@@ -1373,18 +1699,40 @@ class Repeated(Constructed, collections.MutableSequence):
     def __len__(self):
         return len(self._value)
 
+    def __eq__(self, other):
+        # The value is a tuple, which never equals a list, so compare lists
+        # against the elements directly.
+        if isinstance(other, list):
+            return self._value == other
+        return super(Repeated, self).__eq__(other)
+
+    def __ne__(self, other):
+        if isinstance(other, list):
+            return self._value != other
+        return super(Repeated, self).__ne__(other)
+
     def iteritems(self):
         return enumerate(self._value)
 
     def insert(self, index, value):
-        if type(value) is not self.component:
+        if value.__class__ is not self.component:
             value = self.component(value)
         self._value.insert(index, value)
         self._modified = True
 
+    def extend(self, values):
+        # Convert all values at once instead of inserting them one by one.
+        component = self.component
+        values = [v if v.__class__ is component else component(v)
+                  for v in values]
+        if values:
+            self._value.extend(values)
+            self._modified = True
+
     @property
     def value(self):
-        return list(self._value)
+        """A read-only tuple of the elements."""
+        return tuple(self._value)
 
     @classmethod
     def _convert_value(cls, value):
@@ -1395,6 +1743,7 @@ class Repeated(Constructed, collections.MutableSequence):
 @Universal(16, tag.CONSTRUCTED)
 class SequenceOf(Repeated):
     """Sequence Of."""
+    __slots__ = ()
 
     def _encode_value(self):
         ret = [x.encode() for x in self._value]
@@ -1403,8 +1752,11 @@ class SequenceOf(Repeated):
     @classmethod
     def _decode_value(cls, buf, strict=True):
         ret = []
-        while buf:
-            value, buf = cls.component.read(buf, strict=strict)
+        read_at = cls.component._read_at
+        offset = 0
+        end = len(buf)
+        while offset < end:
+            value, offset = read_at(buf, offset, strict=strict)
             ret.append(value)
         return ret
 
@@ -1425,8 +1777,16 @@ class SequenceOf(Repeated):
 @Universal(17, tag.CONSTRUCTED)
 class SetOf(Repeated):
     """Set Of."""
+    __slots__ = ()
 
     def _encode_value(self):
+        # Most sets in practice (e.g., RDNs) hold a single element, which
+        # needs no sorting.
+        if len(self._value) == 1:
+            return self._value[0].encode()
+        # The elements must be sorted by encoding, so collect the encodings
+        # before joining them. Each element is encoded once and the strings
+        # compare bytewise, which is the DER order.
         ret = [x.encode() for x in self._value]
         ret.sort()
         return "".join(ret)
@@ -1434,8 +1794,11 @@ class SetOf(Repeated):
     @classmethod
     def _decode_value(cls, buf, strict=True):
         ret = []
-        while buf:
-            value, buf = cls.component.read(buf, strict=strict)
+        read_at = cls.component._read_at
+        offset = 0
+        end = len(buf)
+        while offset < end:
+            value, offset = read_at(buf, offset, strict=strict)
             ret.append(value)
         # TODO(ekasper): reject BER encodings in strict mode, i.e.,
         # verify sort order.
@@ -1456,6 +1819,8 @@ class SetOf(Repeated):
 
 class Component(object):
     """Sequence component specification."""
+    __slots__ = ("name", "value_type", "default", "encoded_default",
+                 "optional", "defined_by", "lookup", "convert")
 
     def __init__(self, name, value_type, optional=False, default=None,
                  defined_by=None, lookup=None):
@@ -1472,17 +1837,63 @@ class Component(object):
         """
         self.name = name
         self.value_type = value_type
-        if default is None or type(default) is value_type:
-            self.default = default
-        else:
-            self.default = value_type(default)
-        if self.default is not None:
-            self.encoded_default = self.default.encode()
+        if default is None:
+            self.default = self.encoded_default = None
+        elif (issubclass(value_type, Simple) and
+              not issubclass(value_type, Any)):
+            # Specifications often repeat the same default (e.g., BOOLEAN
+            # FALSE). Simple values are immutable, so components can share a
+            # single object and encoding for it. Any is left out, because
+            # decode_inner() stores the decoded contents in place. The cache
+            # lives on the type itself (not on its subclasses), and goes away
+            # with it.
+            cache = value_type.__dict__.get("_default_cache")
+            if cache is None:
+                cache = {}
+                value_type._default_cache = cache
+            try:
+                self.default, self.encoded_default = cache[default]
+            except KeyError:
+                self.default, self.encoded_default = cache[default] = (
+                    self._make_default(value_type, default))
+            except TypeError:
+                # Unhashable defaults are not shared.
+                self.default, self.encoded_default = self._make_default(
+                    value_type, default)
         else:
-            self.encoded_default = None
+            self.default, self.encoded_default = self._make_default(
+                value_type, default)
         self.optional = optional or (self.default is not None)
         self.defined_by = defined_by
         self.lookup = lookup
+        self.convert = self._make_converter(value_type, self.default)
+
+    @staticmethod
+    def _make_default(value_type, default):
+        """Returns a (default, encoded_default) tuple."""
+        if type(default) is not value_type:
+            default = value_type(default)
+        return default, default.encode()
+
+    @staticmethod
+    def _make_converter(value_type, default):
+        """Build a function that converts a component value to value_type.
+
+        The type and default are bound in the closure so that converting a
+        value does not need to look them up.
+        """
+        def convert(value):
+            # If value is None, we store the default if it is different from
+            # None.
+            if value is None:
+                return default
+            elif type(value) is value_type:
+                return value
+            # If the supplied value is not of the exact same type then we
+            # discard the tag information and try to construct from scratch.
+            # TODO(ekasper): verify defined_by constraints here.
+            return value_type(value)
+        return convert
 
 
 class MetaSequence(abc.ABCMeta):
@@ -1492,101 +1903,160 @@ class MetaSequence(abc.ABCMeta):
         # Build a key -> component map for setting values.
         components = dic.get("components", ())
         if components:
+            # Components never change once the class is defined.
+            components = dic["components"] = tuple(components)
+            dic["_len_components"] = len(components)
             key_map = {}
-            for component in components:
+            # Values are stored in a list, in component order.
+            index_map = {}
+            for index, component in enumerate(components):
                 if component.name in key_map:
                     raise TypeError("Duplicate name in Sequence specification")
+                # Components are decoded in order, so the defining component
+                # must precede the component it defines.
+                if (component.defined_by is not None and
+                    component.defined_by not in key_map):
+                    raise TypeError("Component %s is defined by %s, which is "
+                                    "not a preceding component" %
+                                    (component.name, component.defined_by))
                 key_map[component.name] = component
+                index_map[component.name] = index
             dic["key_map"] = key_map
+            dic["_index_map"] = index_map
+            dic["_keys"] = tuple(c.name for c in components)
+            dic["_key_set"] = frozenset(key_map)
+            dic["_defaults"] = tuple(c.default for c in components)
+            # The component attributes in a flat tuple, for unpacking in the
+            # encoding and decoding loops. The defining component of an Any is
+            # given by its index.
+            dic["_component_tuples"] = tuple(
+                (c.name, c.value_type, c.optional, c.default,
+                 c.encoded_default,
+                 None if c.defined_by is None else index_map[c.defined_by],
+                 c.lookup)
+                for c in components)
         return super(MetaSequence, mcs).__new__(mcs, name, bases, dic)
 
 
 @Universal(16, tag.CONSTRUCTED)
 class Sequence(Constructed, collections.MutableMapping):
     """Sequence."""
+    __slots__ = ()
     __metaclass__ = MetaSequence
+    _index_map = {}
+    _keys = ()
+    _key_set = frozenset()
+    _defaults = ()
+    _len_components = 0
+    _component_tuples = ()
 
     def __getitem__(self, key):
-        return self._value[key]
+        return self._value[self._index_map[key]]
 
     def __setitem__(self, key, value):
-        component = self.key_map[key]
-        value = self._convert_single_value(component, value)
-        self._value[key] = value
+        index = self._index_map[key]
+        self._value[index] = self.components[index].convert(value)
         self._modified = True
 
     def __delitem__(self, key):
-        if key not in self.key_map:
+        index = self._index_map.get(key)
+        if index is None:
             raise KeyError("Invalid key %s" % key)
-        self[key] = None
+        # Deleting a component restores its default, as assigning None does.
+        self._value[index] = self.components[index].default
         self._modified = True
 
     def __iter__(self):
         """Iterate component names in order."""
-        for component in self.components:
-            yield component.name
+        return iter(self._keys)
 
     def __len__(self):
         """Missing optional components are counted in the length."""
-        return len(self.components)
+        return self._len_components
+
+    # The Mapping mixins implement the methods below through __iter__ and
+    # __getitem__. Components are stored in order, so answer them directly.
+    def __contains__(self, key):
+        return key in self._index_map
+
+    def get(self, key, default=None):
+        index = self._index_map.get(key)
+        if index is None:
+            return default
+        return self._value[index]
+
+    def keys(self):
+        """Component names in order."""
+        return list(self._keys)
+
+    def values(self):
+        return list(self._value)
+
+    def items(self):
+        return zip(self._keys, self._value)
+
+    def iterkeys(self):
+        return iter(self._keys)
+
+    def itervalues(self):
+        return iter(self._value)
+
+    def iteritems(self):
+        return iter(zip(self._keys, self._value))
 
     @property
     def value(self):
         # Note that this does not preserve the component order.
         # However an order is encoded in the type spec, so we can still
         # recreate the original object from this value.
-        return dict(self._value)
+        return dict(zip(self._keys, self._value))
 
     def _encode_value(self):
         ret = []
-        for component in self.components:
-            value = self._value[component.name]
+        for (name, _, optional, default, encoded_default, _,
+             _), value in zip(self._component_tuples, self._value):
             if value is None:
-                if not component.optional:
+                if not optional:
                     raise error.ASN1Error("Missing %s value in %s" %
-                                          (component.name,
-                                           self.__class__.__name__))
+                                          (name, self.__class__.__name__))
+            elif encoded_default is None:
+                ret.append(value.encode())
+            elif value is default and not value.modified():
+                # The component still holds the shared default object, whose
+                # encoding is known to be encoded_default, so skip encoding it.
+                continue
             else:
-                # Value is not None.
                 # We could compare by value for most types, but for "set" types
                 # different values may yield the same encoding, so we compare
                 # directly by encoding.
                 # (Even though I haven't seen a defaulted set type in practice.)
                 encoded_value = value.encode()
-                if component.encoded_default != encoded_value:
+                if encoded_default != encoded_value:
                     ret.append(encoded_value)
         return "".join(ret)
 
-    @classmethod
-    def _convert_single_value(cls, component, value):
-        # If value is None, we store the default if it is different from None.
-        if value is None:
-            return component.default
-        elif type(value) is component.value_type:
-            return value
-        # If the supplied value is not of the exact same type then we discard
-        # the tag information and try to construct from scratch.
-        else:
-            # TODO(ekasper): verify defined_by constraints here.
-            return component.value_type(value)
-
     @classmethod
     def _convert_value(cls, value):
-        ret = {}
-        value = value or {}
-        if not all([key in cls.key_map for key in value]):
+        if not value:
+            return list(cls._defaults)
+        if not cls._key_set.issuperset(value):
             raise ValueError("Invalid keys in initializer")
-        for component in cls.components:
-            ret[component.name] = cls._convert_single_value(
-                component, value.get(component.name, None))
-        return ret
+        if len(value) == cls._len_components:
+            # All components are given.
+            return [component.convert(value[component.name])
+                    for component in cls.components]
+        return [component.convert(value[component.name])
+                if component.name in value else component.default
+                for component in cls.components]
 
     @classmethod
     def _read_value(cls, buf, strict=True):
-        ret = dict()
-        for component in cls.components:
+        ret = []
+        offset = 0
+        for (_, value_type, optional, default, _, defined_by,
+             lookup) in cls._component_tuples:
             try:
-                value, buf = component.value_type.read(buf, strict=strict)
+                value, offset = value_type._read_at(buf, offset, strict=strict)
             except error.ASN1TagError:
                 # If the component was optional and we got a tag mismatch,
                 # assume decoding failed because the component was missing,
@@ -1598,38 +2068,37 @@ class Sequence(Constructed, collections.MutableMapping):
                 # of component tags. Meanwhile, the worst that can happen is
                 # that we retry in vain and don't return the most helpful error
                 # message when we do finally fail.
-                if not component.optional:
+                if not optional:
                     raise
                 else:
-                    ret[component.name] = component.default
+                    ret.append(default)
             else:
-                ret[component.name] = value
-
-        # Second pass for decoding ANY.
-        for component in cls.components:
-            if component.defined_by is not None:
-                value_type = component.lookup.get(
-                    ret[component.defined_by], None)
-                if value_type is not None:
-                    try:
-                        ret[component.name].decode_inner(value_type,
-                                                         strict=strict)
-                    except error.ASN1Error:
-                        if strict:
-                            raise
-        return ret, buf
+                ret.append(value)
+                # Decode ANY. The defining component precedes this one, so it
+                # has already been read.
+                if defined_by is not None:
+                    value_type = lookup.get(ret[defined_by], None)
+                    if value_type is not None:
+                        try:
+                            value.decode_inner(value_type, strict=strict)
+                        except error.ASN1Error:
+                            if strict:
+                                raise
+        return ret, offset
 
     @classmethod
     def _decode_value(cls, buf, strict=True):
-        ret, buf = cls._read_value(buf, strict=strict)
-        if buf:
+        ret, offset = cls._read_value(buf, strict=strict)
+        if offset != len(buf):
             raise error.ASN1Error("Invalid encoding")
         return ret
 
     @classmethod
     def _read_indefinite_value(cls, buf):
         # We must be in strict=False mode by definition.
-        ret, buf = cls._read_value(buf, strict=False)
-        if buf[:2] != _EOC:
+        ret, offset = cls._read_value(buf, strict=False)
+        if buf[offset:offset + 2] != _EOC:
             raise error.ASN1Error("Missing EOC octets")
-        return ret, buf[2:]
+        # The caller initializes the sequence from a value, so map the
+        # components back to their names.
+        return dict(zip(cls._keys, ret)), buf[offset + 2:]
@@ -1,8 +1,11 @@
 #!/usr/bin/env python
 
+import copy
+import pickle
 import unittest
 
 from ct.crypto import error
+from ct.crypto.asn1 import named_value
 from ct.crypto.asn1 import tag
 from ct.crypto.asn1 import types
 from ct.crypto.asn1 import type_test_base
@@ -108,7 +111,11 @@ class TagLengthValueTest(unittest.TestCase):
             (256, "0100"),
             (-1, "ff"),
             (-128, "80"),
-            (-129, "ff7f")
+            (-129, "ff7f"),
+            (65535, "00ffff"),
+            (-32769, "ff7fff"),
+            (2**63 - 1, "7fffffffffffffff"),
+            (-2**63 + 1, "8000000000000001"),
             )
 
         for value, enc in signed_integer_encodings:
@@ -119,7 +126,9 @@ class TagLengthValueTest(unittest.TestCase):
             (0, "00"),
             (127, "7f"),
             (128, "80"),
-            (256, "0100")
+            (256, "0100"),
+            (2**64 - 1, "ffffffffffffffff"),
+            (2**64, "010000000000000000"),
             )
 
         for value, enc in unsigned_integer_encodings:
@@ -128,6 +137,24 @@ class TagLengthValueTest(unittest.TestCase):
             self.assertEqual(
                 types.decode_int(enc.decode("hex"), signed=False), value)
 
+    def test_decode_int_type(self):
+        # Values in the range of a native int are not returned as longs.
+        for enc in ("ff", "ff7fff", "7fffffffffffffff", "8000000000000000",
+                    "8000000000000001"):
+            self.assertIs(int, type(types.decode_int(enc.decode("hex"))))
+
+    def test_encode_decode_large_int(self):
+        large_integer_encodings = (
+            (2**64, "010000000000000000"),
+            (2**63, "008000000000000000"),
+            (-2**63, "8000000000000000"),
+            (-2**63 - 1, "ff7fffffffffffffff"),
+            )
+
+        for value, enc in large_integer_encodings:
+            self.assertEqual(types.encode_int(value).encode("hex"), enc)
+            self.assertEqual(types.decode_int(enc.decode("hex")), value)
+
     def test_encode_read_length(self):
         length_encodings = (
             (0, "00"),
@@ -358,6 +385,10 @@ class BitStringTest(type_test_base.TypeTestBase):
         ("00000000", "03020000"),
         ("11111111", "030200ff"),
         ("0000000001", "0303060040"),
+        # Values longer than 16 bytes, with leading zero bytes.
+        ("0" * 16 + "1010" * 30, "031200" + "0000" + "aa" * 15),
+        ("0" * 24 + "1" * 109, "031203000000" + "ff" * 13 + "f8"),
+        ("0" * 8 + "10000001" * 19 + "1", "03160700" + "81" * 19 + "80"),
         )
     bad_encodings = (
         # Empty value - padding byte must always be present.
@@ -379,6 +410,37 @@ class BitStringTest(type_test_base.TypeTestBase):
         )
     bad_strict_encodings = ()
 
+    def test_truth_value(self):
+        self.assertFalse(types.BitString(value=""))
+        self.assertTrue(types.BitString(value="0"))
+        self.assertTrue(types.BitString(value="0000000000"))
+        self.assertFalse(types.BitString.decode("030100".decode("hex")))
+        self.assertTrue(types.BitString.decode("03020700".decode("hex")))
+
+
+class NamedBitListTest(unittest.TestCase):
+    class Flags(types.NamedBitList):
+        FIRST = named_value.NamedValue("first", 0)
+        SECOND = named_value.NamedValue("second", 1)
+        NINTH = named_value.NamedValue("ninth", 8)
+        named_bit_list = (FIRST, SECOND, NINTH)
+
+    def test_has_bit_set(self):
+        flags = self.Flags(value="101000001")
+        self.assertTrue(flags.has_bit_set(0))
+        self.assertFalse(flags.has_bit_set(1))
+        self.assertTrue(flags.has_bit_set(8))
+        # Bits beyond the end of the value are not set.
+        self.assertFalse(flags.has_bit_set(9))
+        self.assertEqual([self.Flags.FIRST, self.Flags.NINTH],
+                         flags.bits_set())
+
+    def test_has_bit_set_decoded(self):
+        flags = self.Flags.decode("0303078080".decode("hex"))
+        self.assertEqual("100000001", flags.value)
+        self.assertEqual([self.Flags.FIRST, self.Flags.NINTH],
+                         flags.bits_set())
+
 
 # Mix-in from object so the tests are not run for the base class itself.
 class RepeatedTest(object):
@@ -405,6 +467,29 @@ class RepeatedTest(object):
         self.assertEqual(s, [d])
         self.assertEqual(s.encode(), original_enc)
 
+    def test_extend(self):
+        d = Dummy(value="world")
+        s = self.asn1_type(value=[d])
+        s.extend([])
+        self.assertFalse(s.modified())
+        s.extend([Dummy(value="hello"), "\x00"])
+        self.assertTrue(s.modified())
+        self.assertEqual(s, [d, Dummy(value="hello"), Dummy(value="\x00")])
+        self.assertRaises(TypeError, s.extend, [3])
+
+    def test_value_is_tuple(self):
+        d = Dummy(value="world")
+        d2 = Dummy(value="hello")
+        s = self.asn1_type(value=[d])
+        value = s.value
+        self.assertEqual((d,), value)
+        # The value is a snapshot of the elements.
+        s.append(d2)
+        self.assertEqual((d,), value)
+        self.assertEqual(s, (d, d2))
+        self.assertEqual(s, [d, d2])
+        self.assertNotEqual(s, [d])
+
 
 class SequenceOfTest(type_test_base.TypeTestBase, RepeatedTest):
     # Test with a dummy class.
@@ -414,10 +499,11 @@ class SequenceOfTest(type_test_base.TypeTestBase, RepeatedTest):
     immutable = False
     keyed = False
     initializers = (
-        ([Dummy(value="world"), Dummy(value="hello"), Dummy(value="\x00")],
+        ((Dummy(value="world"), Dummy(value="hello"), Dummy(value="\x00")),
+         [Dummy(value="world"), Dummy(value="hello"), Dummy(value="\x00")],
          ["world", "hello", "\x00"],
          [Dummy(value="world"), "hello", "\x00"]),
-        ([], ()),
+        ((), []),
       )
     bad_initializers = (
         # Can't coerce to Dummy.
@@ -465,10 +551,11 @@ class SetOfTest(type_test_base.TypeTestBase, RepeatedTest):
     immutable = False
     keyed = False
     initializers = (
-        ([Dummy(value="world"), Dummy(value="\x00"), Dummy(value="world")],
+        ((Dummy(value="world"), Dummy(value="\x00"), Dummy(value="world")),
+         [Dummy(value="world"), Dummy(value="\x00"), Dummy(value="world")],
          ["world", "\x00", "world"],
          [Dummy(value="world"), "\x00", "world"]),
-        ([], ()),
+        ((), []),
       )
     bad_initializers = (
         # Can't coerce to Dummy.
@@ -479,6 +566,7 @@ class SetOfTest(type_test_base.TypeTestBase, RepeatedTest):
         )
     encode_test_vectors = (
         ([], "3100"),
+        ([Dummy(value="hi")], "310401026869"),
         # Elements are sorted according to their encoding.
         ([Dummy(value="\x00\xff"), Dummy(value="hello")],
          "310b010200ff010568656c6c6f"),
@@ -679,6 +767,33 @@ class SequenceTest(type_test_base.TypeTestBase):
         self.assertTrue(s["bool"])
         self.assertEqual(s["int"], 2)
 
+    def test_mapping_methods(self):
+        s = DummySequence(value={"bool": True, "int": 2})
+        keys = ["bool", "int", "oct", "any"]
+        self.assertEqual(keys, s.keys())
+        self.assertEqual(keys, list(s.iterkeys()))
+        self.assertTrue("int" in s)
+        self.assertTrue("any" in s)
+        self.assertFalse("boo" in s)
+        self.assertEqual(2, s.get("int"))
+        self.assertIsNone(s.get("any", "missing"))
+        self.assertEqual("missing", s.get("boo", "missing"))
+        values = [True, 2, "hi", None]
+        self.assertEqual(values, s.values())
+        self.assertEqual(values, list(s.itervalues()))
+        self.assertEqual(zip(keys, values), s.items())
+        self.assertEqual(zip(keys, values), list(s.iteritems()))
+
+    def test_delete(self):
+        s = DummySequence(value={"bool": True, "int": 2, "oct": "hello"})
+        del s["int"]
+        self.assertTrue(s.modified())
+        self.assertIsNone(s["int"])
+        # Deleting a defaulted component restores the default.
+        del s["oct"]
+        self.assertEqual(s["oct"], "hi")
+        self.assertRaises(KeyError, s.__delitem__, "boo")
+
     def test_decode_any(self):
         seq = self.asn1_type({"bool": True, "int": 3, "oct": "hello",
                               "any": "\x02\x01\x05"})
@@ -704,6 +819,57 @@ class SequenceTest(type_test_base.TypeTestBase):
         dec = self.asn1_type.decode(enc, strict=False)
         self.assertFalse(dec["any"].decoded)
 
+    def test_components_share_defaults(self):
+        c1 = types.Component("oct", types.OctetString, default="hi")
+        c2 = types.Component("oct2", types.OctetString, default="hi")
+        self.assertIs(c1.default, c2.default)
+        self.assertIs(c1.encoded_default, c2.encoded_default)
+        self.assertEqual("0402" + "hi".encode("hex"),
+                         c1.encoded_default.encode("hex"))
+        # Defaults of different types are distinct.
+        c3 = types.Component("utf8", types.UTF8String, default="hi")
+        self.assertIsInstance(c3.default, types.UTF8String)
+        self.assertNotEqual(c1.encoded_default, c3.encoded_default)
+        # Tagged subtypes do not share the defaults of their parent type.
+        c4 = types.Component("oct3", types.OctetString.implicit(0),
+                             default="hi")
+        self.assertIsNot(c1.default, c4.default)
+        self.assertEqual("8002" + "hi".encode("hex"),
+                         c4.encoded_default.encode("hex"))
+        # Mutable defaults are never shared.
+        c5 = types.Component("seq", SequenceOfTest.SequenceOfDummies,
+                             default=("a", "b"))
+        c6 = types.Component("seq2", SequenceOfTest.SequenceOfDummies,
+                             default=("a", "b"))
+        self.assertIsNot(c5.default, c6.default)
+        # Neither are Any defaults, which decode_inner() modifies in place.
+        c7 = types.Component("any", types.Any, default="\x02\x01\x05")
+        c8 = types.Component("any2", types.Any, default="\x02\x01\x05")
+        self.assertIsNot(c7.default, c8.default)
+        c7.default.decode_inner(types.Integer)
+        self.assertFalse(c8.default.decoded)
+
+    def test_defined_by_must_precede(self):
+        def define_sequence():
+            class BadSequence(types.Sequence):
+                components = (
+                    types.Component("any", types.Any, defined_by="bool",
+                                    lookup=DummySequence.LOOK),
+                    types.Component("bool", types.Boolean))
+        self.assertRaises(TypeError, define_sequence)
+
+    def test_decode_copies_values(self):
+        seq = self.asn1_type({"bool": True, "int": 3, "oct": "hello",
+                              "any": "\x02\x01\x05"})
+        enc = seq.encode()
+        dec = self.asn1_type.decode(enc)
+        # Decoding works on views of the buffer but values and encodings are
+        # always plain strings.
+        self.assertTrue(isinstance(dec["oct"].value, str))
+        self.assertTrue(isinstance(dec["any"].value, str))
+        self.assertTrue(isinstance(dec.encode(), str))
+        self.assertEqual(enc, dec.encode())
+
     def test_indefinite_length_encoding(self):
         # We cannot use bad_strict_encodings because of the re-encoding bug:
         # indefinite length is not preserved.
@@ -729,12 +895,13 @@ class RecursiveTest(type_test_base.TypeTestBase):
     keyed = False
     initializers = (
         # Fully specified sequence.
-        ([{"bool": True, "int": 3, "oct": "hello", "any": "\x02\x01\x05"}],),
+        (({"bool": True, "int": 3, "oct": "hello", "any": "\x02\x01\x05"},),
+         [{"bool": True, "int": 3, "oct": "hello", "any": "\x02\x01\x05"}]),
         # Partially specified sequence.
-        ([{"bool": True, "int": None, "oct": "hi", "any": None}],
+        (({"bool": True, "int": None, "oct": "hi", "any": None},),
          [{"bool": True}],),
         # Empty sequence.
-        ([],)
+        ((), [])
         )
     bad_initializers = (
         # Invalid key in component.
@@ -769,6 +936,53 @@ class RecursiveTest(type_test_base.TypeTestBase):
         self.assertTrue(s.modified())
         self.assertEqual(s.encode(), original_enc)
 
+    def test_modify_grandchild_after_encoding(self):
+        class Outer(types.Sequence):
+            components = (types.Component("l", self.SequenceOfSequence),)
+
+        value = {"bool": True, "int": 3, "any": "\x02\x01\x05"}
+        outer = Outer(value={"l": [value]})
+        original_enc = outer.encode()
+        modified_enc = Outer(value={"l": [dict(value, int=5)]}).encode()
+
+        # Every level now holds a cached encoding, none of which may be
+        # reused once a grandchild changes.
+        outer["l"][0]["int"] = 5
+        self.assertEqual(modified_enc, outer.encode())
+
+        decoded = Outer.decode(original_enc)
+        self.assertEqual(original_enc, decoded.encode())
+        decoded["l"][0]["int"] = 5
+        self.assertEqual(modified_enc, decoded.encode())
+
+
+class PickleTest(unittest.TestCase):
+    def assert_copies_equal(self, obj):
+        copies = [copy.copy(obj), copy.deepcopy(obj)]
+        copies += [pickle.loads(pickle.dumps(obj, protocol))
+                   for protocol in range(pickle.HIGHEST_PROTOCOL + 1)]
+        for obj_copy in copies:
+            self.assertEqual(type(obj), type(obj_copy))
+            self.assertEqual(obj, obj_copy)
+            self.assertEqual(obj.encode(), obj_copy.encode())
+
+    def test_pickle_simple(self):
+        self.assert_copies_equal(types.Integer(value=5))
+        self.assert_copies_equal(types.PrintableString(value="hello"))
+        self.assert_copies_equal(types.BitString(value="0101"))
+        self.assert_copies_equal(types.Integer.decode("\x02\x01\x05"))
+
+    def test_pickle_decoded_sequence(self):
+        enc = "30100101ff020103040568656c6c6f020105".decode("hex")
+        seq = DummySequence.decode(enc)
+        self.assert_copies_equal(seq)
+        # Copies of an encoded or modified sequence are also complete.
+        seq.encode()
+        self.assert_copies_equal(seq)
+        seq["int"] = 4
+        self.assert_copies_equal(seq)
+        self.assert_copies_equal(DummySequence.decode(bytearray(enc)))
+
 
 class PrintTest(unittest.TestCase):
     def test_simple_human_readable(self):